@@ -1,16 +1,23 @@
 #!/usr/bin/env python3
 import os
+import array
 import time
 import json
+import queue
 import struct
-import binascii
 import argparse
 import logging
-from typing import Optional, Dict, Any, Tuple
+import threading
+from typing import Optional, Dict, Any, List, NamedTuple, Tuple, Union
 
 import serial
 import paho.mqtt.client as mqtt
 
+try:
+    import orjson  # optional: faster JSON encoding straight to bytes
+except ImportError:
+    orjson = None
+
 # -----------------------------
 # Logging
 # -----------------------------
@@ -35,19 +42,65 @@ DEFAULT_CELL_COUNT = 7
 # Reserve (Ah) you never want to consume (optional)
 DEFAULT_RESERVE_AH = 15.0
 
+# -----------------------------
+# State topics (built once; the poll loop reuses these strings)
+# -----------------------------
+CELL_TOPICS = tuple(f"{MQTT_TOPIC_BASE}Cell{i}Voltage" for i in range(1, 17))
+TEMP_TOPICS = tuple(f"{MQTT_TOPIC_BASE}BatteryTemp{i}" for i in range(1, 5))
+TOPIC_VOLTAGE = MQTT_TOPIC_BASE + "BatteryVoltage"
+TOPIC_CURRENT = MQTT_TOPIC_BASE + "Current"
+TOPIC_SOC = MQTT_TOPIC_BASE + "SOC"
+TOPIC_REMAINING_CAPACITY = MQTT_TOPIC_BASE + "RemainingCapacity"
+TOPIC_MOS_TEMPERATURE = MQTT_TOPIC_BASE + "MosTemperature"
+TOPIC_POWER_RAW_REG89 = MQTT_TOPIC_BASE + "PowerRawReg89"
+TOPIC_POWER = MQTT_TOPIC_BASE + "Power"
+TOPIC_CHARGING = MQTT_TOPIC_BASE + "Charging"
+TOPIC_DISCHARGING = MQTT_TOPIC_BASE + "Discharging"
+TOPIC_POWER_IN = MQTT_TOPIC_BASE + "PowerIn"
+TOPIC_POWER_OUT = MQTT_TOPIC_BASE + "PowerOut"
+TOPIC_ENERGY_IN = MQTT_TOPIC_BASE + "EnergyIn"
+TOPIC_ENERGY_OUT = MQTT_TOPIC_BASE + "EnergyOut"
+TOPIC_TIME_TO_GO = MQTT_TOPIC_BASE + "TimeToGo"
+TOPIC_BATTERY_ZERO_TIME = MQTT_TOPIC_BASE + "BatteryZeroTime"
+
+# Every state value is published each cycle (sensors advertise force_update), except on
+# these topics, where changes smaller than the epsilon vs. the last published value are skipped.
+PUBLISH_EPSILON: Dict[str, float] = {
+    TOPIC_ENERGY_IN: 0.001,  # kWh
+    TOPIC_ENERGY_OUT: 0.001,  # kWh
+}
+
 # -----------------------------
 # Modbus helpers
 # -----------------------------
-def compute_crc(data: bytes) -> int:
+# Expect response addr 0x51, func 0x03 (based on your original header search)
+RESP_ADDR = 0x51
+RESP_FUNC = 0x03
+NEEDLE = bytes((RESP_ADDR, RESP_FUNC))
+
+# Anything supporting the buffer protocol that indexes to ints (frames are often memoryviews)
+Buffer = Union[bytes, bytearray, memoryview]
+
+def _build_crc16_table() -> array.array:
+    table = array.array("H")
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if (crc & 1) else (crc >> 1)
+        table.append(crc)
+    return table
+
+_CRC16_TABLE = _build_crc16_table()
+
+def compute_crc(data: Buffer) -> int:
     """Modbus RTU CRC16 (poly 0xA001). Returns int 0..65535."""
     crc = 0xFFFF
+    tbl = _CRC16_TABLE
     for b in data:
-        crc ^= b
-        for _ in range(8):
-            crc = (crc >> 1) ^ 0xA001 if (crc & 1) else (crc >> 1)
-    return crc & 0xFFFF
+        crc = (crc >> 8) ^ tbl[(crc ^ b) & 0xFF]
+    return crc
 
-def validate_rtu_frame(frame: bytes) -> bool:
+def validate_rtu_frame(frame: Buffer) -> bool:
     """Frame includes CRC at end (2 bytes, little-endian)."""
     if len(frame) < 5:
         return False
@@ -56,29 +109,55 @@ def validate_rtu_frame(frame: bytes) -> bool:
     calc_crc = compute_crc(data)
     return recv_crc == calc_crc
 
-def find_frame(buf: bytes, addr: int, func: int) -> Optional[bytes]:
+def find_frame(buf: Union[bytes, bytearray], needle: bytes, n: Optional[int] = None) -> Optional[memoryview]:
     """
-    Find a Modbus RTU frame in a buffer:
+    Find a Modbus RTU frame in the first n bytes of a buffer (default: all of it):
     [addr][func][byte_count][data...][crc_lo][crc_hi]
-    Returns the sliced frame if CRC passes, else None.
+    needle is the 2-byte [addr][func] prefix (see NEEDLE).
+    Returns a zero-copy view of the frame if CRC passes, else None.
     """
-    needle = bytes([addr, func])
-    idx = buf.find(needle)
+    if n is None:
+        n = len(buf)
+    idx = buf.find(needle, 0, n)
     if idx == -1:
         return None
-    if len(buf) < idx + 3:
+    if n < idx + 3:
         return None
 
     byte_count = buf[idx + 2]
     frame_len = 3 + byte_count + 2
-    if len(buf) < idx + frame_len:
+    if n < idx + frame_len:
         return None
 
-    frame = buf[idx : idx + frame_len]
+    frame = memoryview(buf)[idx : idx + frame_len]
     if not validate_rtu_frame(frame):
         return None
     return frame
 
+# Receive buffer size: 3-byte header + the 512-byte fallback read
+RX_BUF_SIZE = 3 + 512
+
+def read_response(ser: serial.Serial, rx: memoryview) -> Tuple[Optional[memoryview], memoryview]:
+    """
+    Read one response into the caller's reusable buffer rx, using its byte_count so we
+    return as soon as the frame is in instead of waiting out the serial timeout.
+    Returns (frame or None, raw bytes read) as views into rx, valid until the next call;
+    raw is only for logging bad frames.
+    """
+    n = ser.readinto(rx[:3])
+    if n == 3 and rx[0] == RESP_ADDR and rx[1] == RESP_FUNC:
+        end = 3 + rx[2] + 2
+        n += ser.readinto(rx[3:end])
+        if n == end and validate_rtu_frame(rx[:end]):
+            return rx[:end], rx[:end]
+    if not n:
+        return None, rx[:0]
+
+    # Your device sometimes prepends extra bytes: read a chunk and scan for the frame
+    # (search the bytearray behind rx directly: bytearray.find is C-level and doesn't copy)
+    n += ser.readinto(rx[n:])
+    return find_frame(rx.obj, NEEDLE, n), rx[:n]
+
 # -----------------------------
 # MQTT / HA Discovery
 # -----------------------------
@@ -90,6 +169,15 @@ def ha_device() -> Dict[str, Any]:
         "name": "100Balance BMS",
     }
 
+# Shared by every discovery payload
+_DEVICE_BLOCK = ha_device()
+
+def json_bytes(obj: Any) -> bytes:
+    """Encode a payload to JSON bytes (orjson if installed, else stdlib json)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
 class MqttHa:
     def __init__(self, host: str, port: int, username: str, password: str):
         self.host = host
@@ -106,13 +194,67 @@ class MqttHa:
         if username:
             self.client.username_pw_set(username, password)
 
+        # Telemetry is QoS 0 (fire-and-forget); only discovery uses QoS 1, so never
+        # let the in-flight window or the outgoing queue throttle the poll loop.
+        self.client.max_inflight_messages_set(65535)
+        self.client.max_queued_messages_set(0)
+
+        # Encoded discovery configs (topic -> bytes), re-sent as-is after a reconnect
+        self._discovery: Dict[str, bytes] = {}
+        self._connected_once = False
+        self.client.on_connect = self._on_connect
+
+        # Last published value per PUBLISH_EPSILON topic
+        self._last: Dict[str, float] = {}
+
     def connect(self) -> None:
         self.client.connect(self.host, self.port, 60)
         self.client.loop_start()
-        log.info(f"✅ Connected to MQTT broker at {self.host}:{self.port}")
+        log.info("✅ Connected to MQTT broker at %s:%s", self.host, self.port)
+
+    def _on_connect(self, client, userdata, flags, reason_code, properties) -> None:
+        # paho v2 also calls this for a refused CONNACK; only a real session counts
+        if reason_code.is_failure:
+            log.warning("MQTT connect refused: %s", reason_code)
+            return
+        if self._connected_once:
+            self.republish_discovery()
+            # The broker may have lost retained state; send the epsilon-limited totals again next cycle
+            self._last.clear()
+        self._connected_once = True
+
+    def _changed(self, topic: str, payload: Any) -> Optional[str]:
+        """Returns the payload string to publish, or None if it moved less than the topic's epsilon."""
+        eps = PUBLISH_EPSILON.get(topic)
+        if eps is not None:
+            last = self._last.get(topic)
+            if last is not None and abs(payload - last) < eps:
+                return None
+            self._last[topic] = payload
+        return payload if isinstance(payload, str) else str(payload)
 
     def publish(self, topic: str, payload: Any, retain: bool = True) -> None:
-        self.client.publish(topic, str(payload), retain=retain)
+        # State topics are retained; energy totals are persisted locally, so no broker ack is needed
+        s = self._changed(topic, payload)
+        if s is not None:
+            self.client.publish(topic, s, qos=0, retain=retain)
+
+    def publish_many(self, items: List[Tuple[str, Any]], retain: bool = True) -> None:
+        """Publish a whole poll cycle in one pass (the loop_start() thread does the socket writes)."""
+        publish = self.client.publish
+        changed = self._changed
+        for topic, payload in items:
+            s = changed(topic, payload)
+            if s is not None:
+                publish(topic, s, qos=0, retain=retain)
+
+    def publish_config(self, topic: str, payload_bytes: bytes) -> None:
+        self._discovery[topic] = payload_bytes
+        self.client.publish(topic, payload_bytes, qos=1, retain=True)
+
+    def republish_discovery(self) -> None:
+        for topic, payload_bytes in list(self._discovery.items()):
+            self.client.publish(topic, payload_bytes, qos=1, retain=True)
 
     def discovery_sensor(
         self,
@@ -128,7 +270,7 @@ class MqttHa:
             "name": name,
             "state_topic": f"{MQTT_TOPIC_BASE}{object_id}",
             "unique_id": f"{MQTT_CLIENT_ID}_{object_id}",
-            "device": ha_device(),
+            "device": _DEVICE_BLOCK,
             "force_update": True,
         }
         if unit is not None:
@@ -140,7 +282,7 @@ class MqttHa:
         if icon is not None:
             payload["icon"] = icon
 
-        self.client.publish(topic, json.dumps(payload), retain=True)
+        self.publish_config(topic, json_bytes(payload))
 
     def discovery_binary_sensor(
         self,
@@ -154,7 +296,7 @@ class MqttHa:
             "name": name,
             "state_topic": f"{MQTT_TOPIC_BASE}{object_id}",
             "unique_id": f"{MQTT_CLIENT_ID}_{object_id}",
-            "device": ha_device(),
+            "device": _DEVICE_BLOCK,
             "payload_on": "ON",
             "payload_off": "OFF",
         }
@@ -162,7 +304,7 @@ class MqttHa:
             payload["device_class"] = device_class
         if icon is not None:
             payload["icon"] = icon
-        self.client.publish(topic, json.dumps(payload), retain=True)
+        self.publish_config(topic, json_bytes(payload))
 
     def disconnect(self) -> None:
         try:
@@ -217,27 +359,139 @@ def save_state(path: str, energy_in_kwh: float, energy_out_kwh: float) -> None:
             {"energy_in_kwh": energy_in_kwh, "energy_out_kwh": energy_out_kwh, "ts": int(time.time())},
             f,
         )
+        f.flush()
+        os.fsync(f.fileno())
     os.replace(tmp, path)
 
+def _state_writer(q: "queue.Queue[Tuple[str, float, float]]") -> None:
+    while True:
+        path, energy_in_kwh, energy_out_kwh = q.get()
+        try:
+            save_state(path, energy_in_kwh, energy_out_kwh)
+        except Exception as e:
+            log.error("State save error: %s", e)
+
+def start_state_writer() -> "queue.Queue[Tuple[str, float, float]]":
+    """Daemon thread that does the (slow, SD-card) state writes off the polling thread."""
+    q: "queue.Queue[Tuple[str, float, float]]" = queue.Queue(maxsize=1)
+    threading.Thread(target=_state_writer, args=(q,), name="state-writer", daemon=True).start()
+    return q
+
+def queue_state(q: "queue.Queue[Tuple[str, float, float]]", path: str, energy_in_kwh: float, energy_out_kwh: float) -> None:
+    """Hand totals to the writer without blocking; a still-pending older snapshot is replaced."""
+    try:
+        q.get_nowait()
+    except queue.Empty:
+        pass
+    try:
+        q.put_nowait((path, energy_in_kwh, energy_out_kwh))
+    except queue.Full:
+        pass
+
 # -----------------------------
 # Decode mapping (your existing assumptions + safer behavior)
 # -----------------------------
-def decode_registers_from_frame(frame: bytes) -> Dict[int, int]:
+# Registers (1-based) that decode_frame uses, in ascending order:
+# cells 1..16, temps 49..52, voltage 57, current 58, SOC 59, remaining capacity 76, raw power 89, MOS temp 91
+DECODED_REGS = tuple(range(1, 17)) + tuple(range(49, 53)) + (57, 58, 59, 76, 89, 91)
+
+# byte_count -> (unpacker, Nones for registers the frame doesn't reach); built on first use
+_DECODERS: Dict[int, Tuple[struct.Struct, Tuple[None, ...]]] = {}
+
+def build_decoder(byte_count: int) -> Tuple[struct.Struct, Tuple[None, ...]]:
     """
-    Returns dict: reg_index (1-based) -> uint16 value
-    Frame: [addr][func][byte_count][data...][crc_lo][crc_hi]
+    Specialize the register pick-out to one frame size: a single big-endian Struct with pad
+    bytes over the unused registers, so one unpack_from returns exactly DECODED_REGS.
+    Registers past the end of a short frame are returned as None.
     """
+    n_regs = byte_count // 2
+    present = [r for r in DECODED_REGS if r <= n_regs]
+    fmt = ">"
+    pos = 1
+    for r in present:
+        if r > pos:
+            fmt += f"{(r - pos) * 2}x"
+        fmt += "H"
+        pos = r + 1
+    return struct.Struct(fmt), (None,) * (len(DECODED_REGS) - len(present))
+
+class BmsReading(NamedTuple):
+    """
+    One decoded response. Fields are None if the frame is too short to contain them;
+    cells/temps also hold None for out-of-range values (HA retains the last one).
+    """
+    cells: Tuple[Optional[float], ...]
+    temps: Tuple[Optional[int], ...]
+    voltage: Optional[float]
+    current: Optional[float]
+    soc: Optional[float]
+    rem_capacity: Optional[float]
+    mos_temp: Optional[int]
+    power_raw_reg89: Optional[int]
+
+def decode_frame(frame: Buffer) -> BmsReading:
+    """Decode every field we use from a validated frame (unit scaling inlined, no helper calls)."""
     byte_count = frame[2]
-    data = frame[3 : 3 + byte_count]
-    regs: Dict[int, int] = {}
-    for i in range(0, len(data), 2):
-        reg = (i // 2) + 1
-        regs[reg] = struct.unpack(">H", data[i : i + 2])[0]
-    return regs
+    decoder = _DECODERS.get(byte_count)
+    if decoder is None:
+        decoder = _DECODERS[byte_count] = build_decoder(byte_count)
+    unpacker, missing = decoder
+    v = unpacker.unpack_from(frame, 3) + missing
+
+    # Cells: your old script assumed regs 1..16 are mV cell voltages; keep that, but only trust 1..cell_count.
+    cells = tuple(round(c / 1000.0, 3) if c is not None and 2500 <= c <= 4500 else None for c in v[0:16])
+
+    # Temperatures 49..52 (your device uses val - 40 for temps)
+    temps = tuple(t - 40 if t is not None and -30 <= t - 40 <= 120 else None for t in v[16:20])
+
+    vraw, craw, sraw, rcraw, praw, mraw = v[20:26]
+    return BmsReading(
+        cells=cells,
+        temps=temps,
+        # Voltage reg 57 (0.1V)
+        voltage=round(vraw * 0.1, 2) if vraw is not None else None,
+        # Current reg 58 (your device: (val - 30000) * 0.1 A)
+        current=round((craw - 30000) * 0.1, 2) if craw is not None else None,
+        # SOC reg 59 (0.1%)
+        soc=round(sraw / 10.0, 1) if sraw is not None else None,
+        # Remaining capacity reg 76 (0.1Ah)
+        rem_capacity=round(rcraw * 0.1, 2) if rcraw is not None else None,
+        # MOS temp reg 91 (val - 40)
+        mos_temp=mraw - 40 if mraw is not None else None,
+        # Raw power reg 89 (leave for comparison)
+        power_raw_reg89=praw if praw is not None and praw < 10000 else None,
+    )
 
-def u16_to_temp(val: int) -> int:
-    # your device uses val - 40 for temps
-    return int(val) - 40
+# -----------------------------
+# Serial polling (producer thread)
+# -----------------------------
+def poll_serial(ser: serial.Serial, request_frame: bytes, interval: int, frames: "queue.Queue[Buffer]") -> None:
+    """Request a frame every interval and queue the valid ones for the decode/publish loop."""
+    rx = memoryview(bytearray(RX_BUF_SIZE))
+    while True:
+        t0 = time.time()
+        try:
+            # Drop stale bytes from a late/partial previous response; read_response resyncs on addr/func/CRC anyway
+            stale = ser.in_waiting
+            if stale:
+                ser.read(stale)
+            ser.write(request_frame)
+
+            frame, buf = read_response(ser, rx)
+            if frame is not None:
+                # rx is reused next cycle, so hand the consumer its own copy of just the frame.
+                # Blocks only if the consumer is two frames behind; energy accounting needs every frame
+                frames.put(bytes(frame))
+            elif buf:
+                # If you ever see a different address, log raw once
+                log.warning("Bad/unknown frame (no valid CRC). Raw: %s...", buf[:60].hex())
+        except Exception as e:
+            log.error("Serial error: %s", e)
+
+        # Keep polling cadence stable-ish
+        elapsed = time.time() - t0
+        sleep_for = max(interval - elapsed, 0.2)
+        time.sleep(sleep_for)
 
 # -----------------------------
 # Main polling loop
@@ -258,11 +512,11 @@ def main():
     args = parser.parse_args()
 
     log.info("🚀 Starting 100Balance BMS MQTT bridge")
-    log.info(f"📟 Serial: {args.port} @ {args.baud}, Interval: {args.interval}s")
-    log.info(f"📡 MQTT: {args.mqtt_host}:{args.mqtt_port}")
-    log.info(f"🔋 Pack: {args.cell_count}S LiFePO4, reserve: {args.reserve_ah}Ah")
+    log.info("📟 Serial: %s @ %s, Interval: %ss", args.port, args.baud, args.interval)
+    log.info("📡 MQTT: %s:%s", args.mqtt_host, args.mqtt_port)
+    log.info("🔋 Pack: %sS LiFePO4, reserve: %sAh", args.cell_count, args.reserve_ah)
     if args.persist_state:
-        log.info(f"💾 Energy totals persisted to: {args.persist_state} (every {args.persist_every_sec}s)")
+        log.info("💾 Energy totals persisted to: %s (every %ss)", args.persist_state, args.persist_every_sec)
     else:
         log.info("💾 Energy totals persistence disabled")
 
@@ -277,6 +531,7 @@ def main():
     if args.persist_state:
         energy_in_kwh, energy_out_kwh = load_state(args.persist_state)
         last_persist = time.time()
+        persist_q = start_state_writer()
 
     # Modbus request: same as your script
     # NOTE: your request starts with 0x81 but response appears from 0x51.
@@ -284,119 +539,57 @@ def main():
     req_crc = compute_crc(request)
     request_frame = request + struct.pack("<H", req_crc)
 
-    # Expect response addr 0x51, func 0x03 (based on your original header search)
-    RESP_ADDR = 0x51
-    RESP_FUNC = 0x03
-
+    # Serial I/O runs on its own thread; this thread decodes + publishes the previous frame meanwhile
+    frames: "queue.Queue[Buffer]" = queue.Queue(maxsize=2)
     with serial.Serial(args.port, args.baud, timeout=1) as ser:
+        threading.Thread(
+            target=poll_serial, args=(ser, request_frame, args.interval, frames), name="serial-poller", daemon=True
+        ).start()
         while True:
-            t0 = time.time()
+            frame = frames.get()
             try:
-                ser.reset_input_buffer()
-                ser.write(request_frame)
-
-                # Read a chunk; RTU frames are short but your device sometimes sends extra bytes
-                buf = ser.read(512)
-                if not buf:
-                    time.sleep(args.interval)
-                    continue
-
-                frame = find_frame(buf, RESP_ADDR, RESP_FUNC)
-                if not frame:
-                    # If you ever see a different address, log raw once
-                    log.warning(f"Bad/unknown frame (no valid CRC). Raw: {binascii.hexlify(buf).decode()[:120]}...")
-                    time.sleep(args.interval)
-                    continue
-
-                regs = decode_registers_from_frame(frame)
-
-                # ---- Decode fields (using your mapping + sanity checks) ----
-                # Cells: your old script assumed regs 1..16 are mV cell voltages; keep that, but only trust 1..cell_count.
-                cell_voltages: Dict[int, float] = {}
-                for i in range(1, 17):
-                    vraw = regs.get(i)
-                    if vraw is None:
-                        continue
-                    # mV range check
-                    if 2500 <= vraw <= 4500:
-                        v = round(vraw / 1000.0, 3)
-                        cell_voltages[i] = v
-                        ha.publish(f"{MQTT_TOPIC_BASE}Cell{i}Voltage", v)
-                    else:
-                        # still publish nothing; HA retains last value, which is fine
-                        pass
-
-                # Temperatures 49..52
-                for reg in range(49, 53):
-                    val = regs.get(reg)
-                    if val is None:
-                        continue
-                    temp = u16_to_temp(val)
-                    if -30 <= temp <= 120:
-                        ha.publish(f"{MQTT_TOPIC_BASE}BatteryTemp{reg - 48}", temp)
-
-                # Voltage reg 57 (0.1V)
-                voltage = None
-                vraw = regs.get(57)
-                if vraw is not None:
-                    voltage = round(vraw * 0.1, 2)
-                    if 10 < voltage < 100:
-                        ha.publish(f"{MQTT_TOPIC_BASE}BatteryVoltage", voltage)
-
-                # Current reg 58 (your device: (val - 30000) * 0.1 A)
-                current = None
-                craw = regs.get(58)
-                if craw is not None:
-                    current = round((craw - 30000) * 0.1, 2)
-                    if abs(current) < 500:
-                        ha.publish(f"{MQTT_TOPIC_BASE}Current", current)
-
-                # SOC reg 59 (0.1%)
-                soc = None
-                sraw = regs.get(59)
-                if sraw is not None:
-                    soc = round(sraw / 10.0, 1)
-                    if 0 <= soc <= 100:
-                        ha.publish(f"{MQTT_TOPIC_BASE}SOC", soc)
-
-                # Remaining capacity reg 76 (0.1Ah)
-                rem_capacity = None
-                rcraw = regs.get(76)
-                if rcraw is not None:
-                    rem_capacity = round(rcraw * 0.1, 2)
-                    if 0 < rem_capacity < 2000:
-                        ha.publish(f"{MQTT_TOPIC_BASE}RemainingCapacity", rem_capacity)
-
-                # MOS temp reg 91 (val - 40)
-                mos_temp = None
-                mraw = regs.get(91)
-                if mraw is not None:
-                    mos_temp = u16_to_temp(mraw)
-                    if -30 <= mos_temp <= 150:
-                        ha.publish(f"{MQTT_TOPIC_BASE}MosTemperature", mos_temp)
-
-                # Raw power reg 89 (leave for comparison)
-                power_raw_reg89 = None
-                praw = regs.get(89)
-                if praw is not None and praw < 10000:
-                    power_raw_reg89 = int(praw)
-                    ha.publish(f"{MQTT_TOPIC_BASE}PowerRawReg89", power_raw_reg89)
+                reading = decode_frame(frame)
+                voltage = reading.voltage
+                current = reading.current
+                soc = reading.soc
+                rem_capacity = reading.rem_capacity
+                mos_temp = reading.mos_temp
+                power_raw_reg89 = reading.power_raw_reg89
+
+                # ---- Publish (using your mapping + sanity checks) ----
+                batch: List[Tuple[str, Any]] = [
+                    (topic, v) for topic, v in zip(CELL_TOPICS, reading.cells) if v is not None
+                ]
+                batch.extend((topic, t) for topic, t in zip(TEMP_TOPICS, reading.temps) if t is not None)
+
+                if voltage is not None and 10 < voltage < 100:
+                    batch.append((TOPIC_VOLTAGE, voltage))
+                if current is not None and abs(current) < 500:
+                    batch.append((TOPIC_CURRENT, current))
+                if soc is not None and 0 <= soc <= 100:
+                    batch.append((TOPIC_SOC, soc))
+                if rem_capacity is not None and 0 < rem_capacity < 2000:
+                    batch.append((TOPIC_REMAINING_CAPACITY, rem_capacity))
+                if mos_temp is not None and -30 <= mos_temp <= 150:
+                    batch.append((TOPIC_MOS_TEMPERATURE, mos_temp))
+                if power_raw_reg89 is not None:
+                    batch.append((TOPIC_POWER_RAW_REG89, power_raw_reg89))
 
                 # Signed power from V * I (this is what you should trust)
                 power = None
                 if voltage is not None and current is not None:
                     # charging positive, discharging negative (matches your Vevor convention in the transition you posted)
                     power = int(round(voltage * current))
-                    ha.publish(f"{MQTT_TOPIC_BASE}Power", power)
+                    batch.append((TOPIC_POWER, power))
 
                     charging = power > 30
                     discharging = power < -30
-                    ha.publish(f"{MQTT_TOPIC_BASE}Charging", "ON" if charging else "OFF")
-                    ha.publish(f"{MQTT_TOPIC_BASE}Discharging", "ON" if discharging else "OFF")
+                    batch.append((TOPIC_CHARGING, "ON" if charging else "OFF"))
+                    batch.append((TOPIC_DISCHARGING, "ON" if discharging else "OFF"))
 
                     # Helpful directional sensors (always positive magnitude)
-                    ha.publish(f"{MQTT_TOPIC_BASE}PowerIn", max(power, 0))
-                    ha.publish(f"{MQTT_TOPIC_BASE}PowerOut", max(-power, 0))
+                    batch.append((TOPIC_POWER_IN, max(power, 0)))
+                    batch.append((TOPIC_POWER_OUT, max(-power, 0)))
 
                     # Energy accounting (kWh)
                     dt_h = args.interval / 3600.0
@@ -405,8 +598,8 @@ def main():
                         energy_in_kwh += e_kwh
                     elif power < 0:
                         energy_out_kwh += e_kwh
-                    ha.publish(f"{MQTT_TOPIC_BASE}EnergyIn", round(energy_in_kwh, 6))
-                    ha.publish(f"{MQTT_TOPIC_BASE}EnergyOut", round(energy_out_kwh, 6))
+                    batch.append((TOPIC_ENERGY_IN, round(energy_in_kwh, 6)))
+                    batch.append((TOPIC_ENERGY_OUT, round(energy_out_kwh, 6)))
 
                 # Time-to-go (seconds) using actual voltage (correct for your 7S)
                 time_to_go_s = None
@@ -414,29 +607,28 @@ def main():
                     usable_ah = max(rem_capacity - args.reserve_ah, 0.0)
                     usable_wh = usable_ah * voltage
                     time_to_go_s = int((usable_wh / abs(power)) * 3600)
-                    ha.publish(f"{MQTT_TOPIC_BASE}TimeToGo", time_to_go_s)
+                    batch.append((TOPIC_TIME_TO_GO, time_to_go_s))
                     hh = time_to_go_s // 3600
                     mm = (time_to_go_s % 3600) // 60
-                    ha.publish(f"{MQTT_TOPIC_BASE}BatteryZeroTime", f"{hh}h {mm}m")
+                    batch.append((TOPIC_BATTERY_ZERO_TIME, f"{hh}h {mm}m"))
 
-                # Single summary line
-                summary = f"V={voltage}V, I={current}A, SOC={soc}%, P={power}W, RC={rem_capacity}Ah, MOS={mos_temp}°C"
-                log.info(summary)
+                ha.publish_many(batch)
+
+                # Single summary line (%-args so nothing is formatted when INFO is off)
+                log.info(
+                    "V=%sV, I=%sA, SOC=%s%%, P=%sW, RC=%sAh, MOS=%s°C",
+                    voltage, current, soc, power, rem_capacity, mos_temp,
+                )
 
                 # Persist totals (rate-limited writes)
                 if args.persist_state:
                     now = time.time()
                     if now - last_persist >= args.persist_every_sec:
-                        save_state(args.persist_state, energy_in_kwh, energy_out_kwh)
+                        queue_state(persist_q, args.persist_state, energy_in_kwh, energy_out_kwh)
                         last_persist = now
 
             except Exception as e:
-                log.error(f"Loop error: {e}")
-
-            # Keep polling cadence stable-ish
-            elapsed = time.time() - t0
-            sleep_for = max(args.interval - elapsed, 0.2)
-            time.sleep(sleep_for)
+                log.error("Loop error: %s", e)
 
 if __name__ == "__main__":
     main()